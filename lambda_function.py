@@ -1,201 +1,618 @@
 import boto3
-import io
+import os
 import datetime
-from openpyxl import Workbook
+import collections
+import itertools
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from xml.sax.saxutils import escape, quoteattr
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 # List of required tags
-REQUIRED_TAGS = ["DeletionDate", "vendor", "owner", "purpose"]
+REQUIRED_TAGS = ("DeletionDate", "vendor", "owner", "purpose")
+_REQUIRED_TAGS_SET = frozenset(REQUIRED_TAGS)
+
+# One report row per resource; a tuple in the same order as the sheet columns
+Row = collections.namedtuple("Row", ["Arn", "Service", "ResourceType", "Creator", "EventName", "EventTime", *REQUIRED_TAGS])
+
+# 🟩 Updated headers to include Creator, EventName, EventTime
+_HEADERS = ("Resource ARN", "Service", "Resource Type", "Creator", "EventName", "EventTime", *REQUIRED_TAGS)
+_TEXT_COLUMNS = len(_HEADERS) - len(REQUIRED_TAGS)
 
 # 🟩 CUSTOMIZE THESE VALUES ACCORDING TO YOUR SETUP
 REGIONS = ["ap-northeast-1", "ap-south-1"]  # 🟩 Update regions as per your AWS setup
 BUCKET_NAME = "vb-auto-tag-check-and-compliance-report-bucket"  # 🟩 Your destination S3 bucket
-QUERY_FILTER = "-NOT (tagKey:vendor OR tagKey:owner OR tagKey:purpose OR tagKey:DeletionDate)"  # 🟩 Modify if you change tag keys
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", "16"))  # 🟩 Concurrent CloudTrail lookups
+# 🟩 Optional CloudTrail Lake event data store ARN; when set, creators come from one Lake query instead of per-resource lookups
+CLOUDTRAIL_EVENT_DATA_STORE_ARN = os.getenv("CLOUDTRAIL_EVENT_DATA_STORE_ARN", "")
+# 🟩 Seconds to wait for the Lake query before cancelling it and falling back to per-resource lookups
+CLOUDTRAIL_LAKE_TIMEOUT_SECONDS = float(os.getenv("CLOUDTRAIL_LAKE_TIMEOUT_SECONDS", "60"))
+
+# One Resource Explorer query per required tag ("missing tag X"); the union is every resource missing any required tag.
+# The queries run in parallel per region. They only match on tag keys, so a resource whose only problem is an empty
+# required tag value (owner="") is not returned; rows that are returned still mark empty values as Missing
+QUERY_FILTERS = [f"-tag.key:{tag}" for tag in REQUIRED_TAGS]
+
+# Multipart settings for the report upload (parts are sent in parallel above the threshold)
+UPLOAD_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True
+)
+
+# Clients are built once per Lambda execution context and reused across warm invocations
+_SESSION = boto3.session.Session()
+_CLIENTS = {}
+_CLIENT_LOCK = threading.Lock()  # creating clients from a shared session is not thread-safe
+# Adaptive retries back off under throttling; the pool is sized for the lookup and multipart upload threads
+_CLIENT_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=max(32, MAX_WORKERS),
+    retries={'mode': 'adaptive', 'max_attempts': 10}
+)
+
+
+# Function to get the shared client for a service/region, creating it on first use
+def _client(service, region=None):
+    client = _CLIENTS.get((service, region))
+    if client is None:
+        with _CLIENT_LOCK:
+            client = _CLIENTS.get((service, region))
+            if client is None:
+                client = _SESSION.client(service, region_name=region, config=_CLIENT_CONFIG)
+                _CLIENTS[(service, region)] = client
+    return client
+
+
+# 🟩 Optionally pin views with VIEW_ARNS="ap-northeast-1=arn:...,ap-south-1=arn:..." or per region with
+# 🟩 REX_VIEW_ARN_AP_NORTHEAST_1=arn:... to skip list_views() entirely. Pinned views are never evicted.
+_PINNED_VIEW_ARNS = {
+    region.strip(): view_arn.strip()
+    for region, _, view_arn in (entry.partition("=") for entry in os.environ.get("VIEW_ARNS", "").split(","))
+    if region.strip() and view_arn.strip()
+}
+for _region in REGIONS:
+    _view_arn = os.environ.get(f"REX_VIEW_ARN_{_region.upper().replace('-', '_')}", "").strip()
+    if _view_arn:
+        _PINNED_VIEW_ARNS[_region] = _view_arn
+
+# View ARNs discovered with list_views(), kept across warm invocations
+_VIEW_ARN_CACHE = {}
+
+# Errors meaning a discovered view is gone or no longer usable (throttling and other transient errors keep it)
+_STALE_VIEW_ERROR_CODES = ("AccessDeniedException", "ResourceNotFoundException", "UnauthorizedException")
+
+
+# Function to get the view ARN for a region (list_views() only runs when it is neither pinned nor cached)
+def _get_view_arn(client, region):
+    view_arn = _PINNED_VIEW_ARNS.get(region) or _VIEW_ARN_CACHE.get(region)
+    if view_arn:
+        return view_arn
+
+    # Get available views
+    view_response = client.list_views()
+    views = view_response.get('Views', [])
+    if not views:
+        return None
+
+    first_view = views[0]
+    view_arn = first_view.get('ViewArn') if isinstance(first_view, dict) else first_view
+    _VIEW_ARN_CACHE[region] = view_arn
+    return view_arn
+
+
+# Function to get the resource name CloudTrail indexes for an ARN (rpartition avoids splitting every ARN segment)
+def _resource_name(arn):
+    return arn.rpartition("/")[2] if "/" in arn else arn.rpartition(":")[2]
+
+
+# Event name prefixes of CloudTrail events that create a resource, minus the tagging and policy calls that share them
+# (CreateTags, PutBucketTagging, PutBucketPolicy, ...) and only ever change an existing resource
+_CREATOR_EVENT_PREFIXES = ("Create", "Run", "Put", "Allocate", "Register")
+_NON_CREATOR_EVENTS = ("CreateTags",)
+_NON_CREATOR_EVENT_SUFFIXES = ("Tagging", "Policy")
+
+
+# Function to check whether a CloudTrail event name is a resource creation (the rule both creator sources use)
+def _is_creator_event(event_name):
+    return (
+        event_name.startswith(_CREATOR_EVENT_PREFIXES)
+        and event_name not in _NON_CREATOR_EVENTS
+        and not event_name.endswith(_NON_CREATOR_EVENT_SUFFIXES)
+    )
+
+
+# Creation calls covered by the CloudTrail Lake index, with the SQL expression reading the created resource's identifier.
+# Raw CloudTrail records rarely carry "resources", so the identifier comes from requestParameters/responseElements
+# (nested values are JSON strings). Every name here passes _is_creator_event; only the first instance of a
+# multi-instance RunInstances is indexed, the others fall back to LookupEvents.
+_LAKE_CREATOR_EVENTS = {
+    "RunInstances": "json_extract_scalar(element_at(responseElements, 'instancesSet'), '$.items[0].instanceId')",
+    "CreateVolume": "element_at(responseElements, 'volumeId')",
+    "CreateSecurityGroup": "element_at(responseElements, 'groupId')",
+    "CreateVpc": "json_extract_scalar(element_at(responseElements, 'vpc'), '$.vpcId')",
+    "CreateSubnet": "json_extract_scalar(element_at(responseElements, 'subnet'), '$.subnetId')",
+    "CreateBucket": "element_at(requestParameters, 'bucketName')",
+    "CreateFunction20150331": "element_at(requestParameters, 'functionName')",
+    "CreateRole": "element_at(requestParameters, 'roleName')",
+    "CreateUser": "element_at(requestParameters, 'userName')",
+    "CreateTable": "element_at(requestParameters, 'tableName')",
+    "CreateLogGroup": "element_at(requestParameters, 'logGroupName')",
+    "CreateDBInstance": "element_at(requestParameters, 'dBInstanceIdentifier')",
+    "CreateQueue": "element_at(requestParameters, 'queueName')",
+    "CreateTopic": "element_at(requestParameters, 'name')",
+    "CreateRepository": "element_at(requestParameters, 'repositoryName')",
+    "CreateKey": "json_extract_scalar(element_at(responseElements, 'keyMetadata'), '$.keyId')",
+}
+
+
+# Function to load creator events for every region with a single CloudTrail Lake query,
+# keyed by (region, resource name); returns {} on failure so lookups fall back to LookupEvents
+def load_creator_index(start_time, end_time):
+    creator_index = {}
+    try:
+        lake_region = CLOUDTRAIL_EVENT_DATA_STORE_ARN.split(":")[3]
+        event_data_store = CLOUDTRAIL_EVENT_DATA_STORE_ARN.rpartition("/")[2]
+        regions = ", ".join(f"'{region}'" for region in REGIONS)
+        # Only real creation calls are loaded (not every Create*/Put* event in the window), and the oldest one
+        # per resource wins, as in the LookupEvents path
+        creator_events = ", ".join(f"'{event_name}'" for event_name in _LAKE_CREATOR_EVENTS)
+        resource_id = " ".join(
+            f"WHEN '{event_name}' THEN {expression}" for event_name, expression in _LAKE_CREATOR_EVENTS.items()
+        )
+        query = (
+            f"SELECT awsRegion AS region, coalesce(CASE eventName {resource_id} END, element_at(resources, 1).arn) AS resource_id, "
+            "coalesce(userIdentity.username, userIdentity.arn) AS username, eventName AS event_name, eventTime AS event_time "
+            f"FROM {event_data_store} "
+            f"WHERE eventTime >= '{start_time:%Y-%m-%d %H:%M:%S}' AND eventTime <= '{end_time:%Y-%m-%d %H:%M:%S}' "
+            f"AND awsRegion IN ({regions}) AND eventName IN ({creator_events}) "
+            "ORDER BY eventTime"
+        )
+
+        cloudtrail = _client('cloudtrail', lake_region)
+        query_id = cloudtrail.start_query(QueryStatement=query)["QueryId"]
+        print(f"🔍 Loading creators from CloudTrail Lake (query {query_id})")
+
+        deadline = time.monotonic() + CLOUDTRAIL_LAKE_TIMEOUT_SECONDS
+        next_token = None
+        while True:
+            kwargs = {"QueryId": query_id}
+            if next_token:
+                kwargs["NextToken"] = next_token
+            response = cloudtrail.get_query_results(**kwargs)
+
+            status = response.get("QueryStatus")
+            if status in ("QUEUED", "RUNNING"):
+                if time.monotonic() >= deadline:
+                    # Stop the query so it doesn't keep scanning (and billing) after the fallback takes over
+                    cloudtrail.cancel_query(QueryId=query_id)
+                    print(f"⚠️ CloudTrail Lake query timed out after {CLOUDTRAIL_LAKE_TIMEOUT_SECONDS:g}s, falling back to LookupEvents")
+                    return {}
+                time.sleep(1)
+                continue
+            if status != "FINISHED":
+                raise RuntimeError(f"query ended with status {status}")
+
+            for result_row in response.get("QueryResultRows", []):
+                values = {key: value for column in result_row for key, value in column.items()}
+                if not values.get("resource_id"):
+                    continue
+                # Rows are oldest first, so the first creation event seen for a resource is its creation.
+                # Identifiers may be names, paths or ARNs; all reduce to the name the resource's ARN ends with
+                creator_index.setdefault(
+                    (values.get("region"), _resource_name(values["resource_id"])),
+                    (values.get("username") or "Unknown", values.get("event_name", "Unknown"), values.get("event_time", "Unknown"))
+                )
+
+            next_token = response.get("NextToken")
+            if not next_token:
+                break
+
+        print(f"✅ Creator events loaded from CloudTrail Lake: {len(creator_index)}")
+    except Exception as error:
+        print(f"⚠️ CloudTrail Lake query failed, falling back to LookupEvents: {error}")
+        creator_index = {}
+    return creator_index
+
+
+# Function to get the creator of a service-linked role from its ARN path (aws-service-role/<service principal>/...)
+def _service_linked_role_creator(arn):
+    if ":role/aws-service-role/" not in arn:
+        return None
+    # No event was read, so the event name says where the creator came from instead of naming a CloudTrail event
+    return arn.split(":role/aws-service-role/", 1)[1].partition("/")[0], "ARN-implied", "N/A"
+
+
+# Per-service parsers for resources whose creator can be read from the ARN, so CloudTrail is skipped for them
+_ARN_CREATOR_PARSERS = {
+    "iam": _service_linked_role_creator,
+}
+
+
+# Creators found by LookupEvents, keyed on (resource name, region, UTC day of the window end) and kept across
+# warm invocations on the same day (least recently used entries are dropped past the limit)
+_CREATOR_CACHE = collections.OrderedDict()
+_CREATOR_CACHE_LOCK = threading.Lock()
+_CREATOR_CACHE_SIZE = 4096
+
+
+# CloudTrail lookup for a resource name; returns None when the window has no events for it.
+# Errors are raised rather than returned so failed lookups are not cached.
+def _lookup_creator(resource_name, region, start_time, end_time):
+    paginator = _client('cloudtrail', region).get_paginator("lookup_events")
+    fallback = None
+    creator = None
+
+    # One pass over the whole window: most untagged resources are older than a week, and LookupEvents is
+    # limited to about 2 TPS per account, so splitting the window would mostly cost an extra call
+    pages = paginator.paginate(
+        LookupAttributes=[{"AttributeKey": "ResourceName", "AttributeValue": resource_name}],
+        StartTime=start_time,
+        EndTime=end_time,
+        PaginationConfig={"PageSize": 50, "MaxItems": 50}
+    )
+    for page in pages:
+        for event in page.get("Events", []):
+            found = (event.get("Username", "Unknown"), event.get("EventName", "Unknown"), event.get("EventTime", "Unknown"))
+            # Events come newest first, so the last creation event fetched is the oldest one (the creation itself)
+            if _is_creator_event(found[1]):
+                creator = found
+            if fallback is None:
+                fallback = found
+
+    # No creation event in the window; report the latest event like before
+    return creator or fallback
 
 
 # 🟩 Optimized CloudTrail-based creator lookup function (replaces old one)
 def get_creator_from_cloudtrail(arn, region, start_time, end_time):
     """Find who created the given resource ARN from CloudTrail logs."""
-    cloudtrail = boto3.client("cloudtrail", region_name=region)
     try:
         # Use resource name instead of full ARN for better match
-        resource_name = arn.split("/")[-1] if "/" in arn else arn.split(":")[-1]
-
-        events = cloudtrail.lookup_events(
-            LookupAttributes=[{"AttributeKey": "ResourceName", "AttributeValue": resource_name}],
-            StartTime=start_time,
-            EndTime=end_time,
-            MaxResults=5
-        )
-        if events.get("Events"):
-            event = events["Events"][0]
-            username = event.get("Username", "Unknown")
-            event_name = event.get("EventName", "Unknown")
-            event_time = event.get("EventTime", "Unknown")
-            return username, event_name, event_time
+        resource_name = _resource_name(arn)
+
+        # Resources sharing a name (and later warm invocations on the same day) reuse an earlier lookup
+        cache_key = (resource_name, region, end_time.date())
+        with _CREATOR_CACHE_LOCK:
+            creator = _CREATOR_CACHE.get(cache_key)
+            if creator:
+                _CREATOR_CACHE.move_to_end(cache_key)
+                return creator
+
+        # The lookup uses the real window, so it never reaches past end_time
+        creator = _lookup_creator(resource_name, region, start_time, end_time)
+        if creator:
+            # Misses are not cached, so events that arrive later in the day are still picked up
+            with _CREATOR_CACHE_LOCK:
+                _CREATOR_CACHE[cache_key] = creator
+                if len(_CREATOR_CACHE) > _CREATOR_CACHE_SIZE:
+                    _CREATOR_CACHE.popitem(last=False)
+            return creator
     except Exception as e:
         print(f"⚠️ CloudTrail lookup failed for {arn}: {e}")
     return "Unknown", "Unknown", "Unknown"
 
 
-# Function to fetch all resources from the selected regions
-def fetch_resources_from_regions():
+# Function to run one "missing tag" query in a region, returning (arn, service, type, tag values) per resource
+def _search_missing_tag(client, view_arn, query_filter):
+    # search() flattens the pages into a single stream of resources
+    resources = client.get_paginator('search').paginate(
+        QueryString=query_filter,
+        ViewArn=view_arn,
+        PaginationConfig={'PageSize': 1000}
+    ).search("Resources[]")
+
+    # Tag status is evaluated here so the rows come out ready for the report
+    found = []
+    for resource in resources:
+        tag_status = evaluate_tag_status(resource)
+        found.append((
+            resource.get("Arn"),
+            resource.get("Service", "N/A"),
+            resource.get("ResourceType", "N/A"),
+            [tag_status[tag] for tag in REQUIRED_TAGS]
+        ))
+    return found
+
+
+# Function to fetch all resources from a single region
+def _fetch_region(region, start_time, end_time, lookup_executor, creator_index_future=None):
+    region_resources = []
+    seen_arns = set()
+
+    # Column widths are tracked here so sheet prep overlaps with the other regions' I/O;
+    # tag columns only ever hold "Present"/"Missing"
+    column_widths = [len(header) for header in _HEADERS[:_TEXT_COLUMNS]]
+    column_widths += [max(len(tag), len("Present"), len("Missing")) for tag in REQUIRED_TAGS]
+
+    print(f"🔍 Searching resources in region: {region}")
+    client = _client('resource-explorer-2', region)
+
+    view_arn = _get_view_arn(client, region)
+    if not view_arn:
+        print(f"⚠️ No views found in region: {region}")
+        return region_resources, column_widths
+    print(f"Using ViewArn for {region}: {view_arn}")
+
+    # The per-tag queries run side by side, so a region costs one query's round trips instead of one per tag
+    with ThreadPoolExecutor(max_workers=len(QUERY_FILTERS)) as search_executor:
+        results = search_executor.map(lambda query_filter: _search_missing_tag(client, view_arn, query_filter), QUERY_FILTERS)
+
+        for found in results:
+            for item in found:
+                # A resource missing several tags is returned by several queries; keep the first one
+                if item[0] in seen_arns:
+                    continue
+                seen_arns.add(item[0])
+                region_resources.append(item)
+
+    # 🟩 Get creator from the CloudTrail Lake index when available, else from CloudTrail
+    # (lookups run concurrently on the shared pool)
+    creator_index = creator_index_future.result() if creator_index_future else {}
+    if creator_index:
+        lake_matches = sum((region, _resource_name(item[0])) in creator_index for item in region_resources)
+        print(f"CloudTrail Lake index matched {lake_matches} of {len(region_resources)} resources in {region}")
+
+    def resolve_creator(item):
+        arn, service = item[0], item[1]
+        parser = _ARN_CREATOR_PARSERS.get(service)
+        creator = parser(arn) if parser else None
+        if not creator:
+            creator = creator_index.get((region, _resource_name(arn)))
+        return creator or get_creator_from_cloudtrail(arn, region, start_time, end_time)
+
+    creators = lookup_executor.map(resolve_creator, region_resources)
+
+    # Rows replace their pending entries in place, so the region is only held in memory once
+    for index, creator in enumerate(creators):
+        arn, service, resource_type, tag_values = region_resources[index]
+        username, event_name, event_time = creator
+        row = Row(arn, service, resource_type, username, event_name, str(event_time), *tag_values)
+        region_resources[index] = row
+
+        for column, length in enumerate(map(len, row[:_TEXT_COLUMNS])):
+            if length > column_widths[column]:
+                column_widths[column] = length
+
+    return region_resources, column_widths
+
+
+# Generator over the selected regions (searched in parallel) yielding (region, rows, column widths)
+# as each region finishes, so its sheet can be written while the other regions are still being fetched
+def iter_resources_by_region():
     try:
-        all_resources = []
+        total = 0
 
         # Define CloudTrail time window (last 30 days)
         end_time = datetime.datetime.now(datetime.timezone.utc)
         start_time = end_time - datetime.timedelta(days=30)
 
-        for region in REGIONS:
-            print(f"🔍 Searching resources in region: {region}")
-            client = boto3.client('resource-explorer-2', region_name=region)
-
-            # Get available views
-            view_response = client.list_views()
-            views = view_response.get('Views', [])
-            if not views:
-                print(f"⚠️ No views found in region: {region}")
-                continue
-
-            first_view = views[0]
-            view_arn = first_view.get('ViewArn') if isinstance(first_view, dict) else first_view
-            print(f"Using ViewArn for {region}: {view_arn}")
-
-            paginator = client.get_paginator('search')
-            response_pages = paginator.paginate(QueryString=QUERY_FILTER, ViewArn=view_arn)
-
-            for response in response_pages:
-                for resource in response.get("Resources", []):
-                    arn = resource.get("Arn")
-                    tags = resource.get("Properties", [])
-                    service = resource.get("Service", "N/A")
-                    resource_type = resource.get("ResourceType", "N/A")
-
-                    # 🟩 Get creator from CloudTrail (new logic)
-                    username, event_name, event_time = get_creator_from_cloudtrail(arn, region, start_time, end_time)
-
-                    all_resources.append({
-                        "Arn": arn,
-                        "Region": region,
-                        "Service": service,
-                        "ResourceType": resource_type,
-                        "Creator": username,
-                        "EventName": event_name,
-                        "EventTime": str(event_time),
-                        "Tags": tags
-                    })
-
-        print(f"✅ Total resources fetched: {len(all_resources)}")
-        return all_resources
+        # Region searches and CloudTrail lookups use separate pools so region workers never wait on their own pool
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as lookup_executor, \
+                ThreadPoolExecutor(max_workers=min(len(REGIONS), 8)) as executor:
+            # The Lake query (if configured) runs while the regions are being searched
+            creator_index_future = None
+            if CLOUDTRAIL_EVENT_DATA_STORE_ARN:
+                creator_index_future = lookup_executor.submit(load_creator_index, start_time, end_time)
+
+            futures = {
+                executor.submit(_fetch_region, region, start_time, end_time, lookup_executor, creator_index_future): region
+                for region in REGIONS
+            }
+            for future in as_completed(futures):
+                region = futures[future]
+                try:
+                    region_resources, column_widths = future.result()
+                except Exception as error:
+                    # A discovered view may have been deleted or become inaccessible; look it up again next time
+                    if isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in _STALE_VIEW_ERROR_CODES:
+                        _VIEW_ARN_CACHE.pop(region, None)
+                    # Drop queued work so the failure reaches the report producer (and aborts the upload) promptly
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    lookup_executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+                if region_resources:
+                    total += len(region_resources)
+                    yield region, region_resources, column_widths
+
+        print(f"✅ Total resources fetched: {total}")
 
     except Exception as error:
         print(f"❌ Error fetching resources: {error}")
-        return []
+        raise
 
 
 # Function to determine tag status for each required tag
 def evaluate_tag_status(resource):
-    tag_status = {}
-    tag_keys = {t["Data"]["Key"]: t["Data"]["Value"] for t in resource.get("Tags", []) if "Data" in t and "Key" in t["Data"]}
-
-    for tag in REQUIRED_TAGS:
-        if tag in tag_keys and tag_keys[tag]:
-            tag_status[tag] = "Present"
-        else:
-            tag_status[tag] = "Missing"
-
-    return tag_status
-
-
-# Function to categorize resources by region with tag status
-def categorize_by_region_with_tags(resources):
-    categorized = {}
-    for res in resources:
-        region = res.get("Region", "unknown")
-        arn = res.get("Arn")
-        tag_status = evaluate_tag_status(res)
-        service = res.get("Service", "N/A")
-        resource_type = res.get("ResourceType", "N/A")
-        creator = res.get("Creator", "N/A")
-        event_name = res.get("EventName", "N/A")
-        event_time = res.get("EventTime", "N/A")
-
-        if region not in categorized:
-            categorized[region] = []
-        categorized[region].append({
-            "Arn": arn,
-            "Service": service,
-            "ResourceType": resource_type,
-            "Creator": creator,
-            "EventName": event_name,
-            "EventTime": event_time,
-            **tag_status
-        })
-    return categorized
-
-
-# Function to generate Excel with multiple sheets (1 per region)
-def generate_excel_report(grouped_resources):
-    workbook = Workbook()
-    default_sheet = workbook.active
-    workbook.remove(default_sheet)
-
-    for region, resources in grouped_resources.items():
-        worksheet = workbook.create_sheet(title=region)
-
-        # 🟩 Updated headers to include Creator, EventName, EventTime
-        headers = ["Resource ARN", "Service", "Resource Type", "Creator", "EventName", "EventTime"] + REQUIRED_TAGS
-        worksheet.append(headers)
-
-        for res in resources:
-            row = [
-                res["Arn"], res["Service"], res["ResourceType"],
-                res["Creator"], res["EventName"], res["EventTime"]
-            ] + [res[tag] for tag in REQUIRED_TAGS]
-            worksheet.append(row)
-
-        for column_cells in worksheet.columns:
-            length = max(len(str(cell.value)) for cell in column_cells)
-            worksheet.column_dimensions[column_cells[0].column_letter].width = min(length + 2, 80)
-
-    excel_buffer = io.BytesIO()
-    workbook.save(excel_buffer)
-    excel_buffer.seek(0)
-    return excel_buffer
+    # Tags live in the single property named "tags", whose Data is the list of {Key, Value} pairs
+    tags = next((p.get("Data") for p in resource.get("Properties", ()) if p.get("Name") == "tags"), None) or ()
+
+    # Only required keys are kept, so non-required tags never get their values checked
+    present = {
+        t["Key"] for t in tags
+        if isinstance(t, dict) and t.get("Key") in _REQUIRED_TAGS_SET and t.get("Value")
+    }
+    return {tag: ("Present" if tag in present else "Missing") for tag in REQUIRED_TAGS}
+
+
+# Static parts of the XLSX package; only the sheet list and the sheets themselves vary per report
+_XLSX_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_XLSX_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_XLSX_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_ROOT_RELS = (
+    f'{_XML_DECLARATION}<Relationships xmlns="{_XLSX_PKG_REL_NS}">'
+    f'<Relationship Id="rId1" Type="{_XLSX_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_STYLES = (
+    f'{_XML_DECLARATION}<styleSheet xmlns="{_XLSX_NS}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_ROWS_PER_WRITE = 1000
+_HEADER_ROW_XML = (
+    '<row r="1">' + "".join(f'<c t="inlineStr"><is><t>{escape(header)}</t></is></c>' for header in _HEADERS) + '</row>'
+).encode()
+
+
+# Function to stream one worksheet's XML (inline strings, so no shared-string table is needed)
+def _write_sheet_xml(sheet_file, resources, widths):
+    cols = "".join(
+        f'<col min="{index}" max="{index}" width="{min(width + 2, 80)}" customWidth="1"/>'
+        for index, width in enumerate(widths, start=1)
+    )
+    sheet_file.write(f'{_XML_DECLARATION}<worksheet xmlns="{_XLSX_NS}"><cols>{cols}</cols><sheetData>'.encode())
+    sheet_file.write(_HEADER_ROW_XML)
+
+    chunk = []
+    for row_index, row in enumerate(resources, start=2):
+        cells = "".join(f'<c t="inlineStr"><is><t>{escape(value)}</t></is></c>' for value in row)
+        chunk.append(f'<row r="{row_index}">{cells}</row>')
+        if len(chunk) == _ROWS_PER_WRITE:
+            sheet_file.write("".join(chunk).encode())
+            chunk = []
+    sheet_file.write(("".join(chunk) + '</sheetData></worksheet>').encode())
+
+
+# Function to generate Excel with multiple sheets (1 per region) into the given file object
+def generate_excel_report(region_results, output):
+    # The XLSX XML is emitted directly, so no spreadsheet object model is built in memory;
+    # each region's rows are released as soon as its sheet is written
+    regions = []
+
+    # Level 1 deflate is several times cheaper in Lambda CPU than the default level 6, and ARN text still compresses well
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as package:
+        for sheet_number, (region, resources, widths) in enumerate(region_results, start=1):
+            regions.append(region)
+            with package.open(f"xl/worksheets/sheet{sheet_number}.xml", "w") as sheet_file:
+                _write_sheet_xml(sheet_file, resources, widths)
+
+        sheet_overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{number}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for number in range(1, len(regions) + 1)
+        )
+        package.writestr("[Content_Types].xml", (
+            f'{_XML_DECLARATION}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{sheet_overrides}</Types>'
+        ))
+        package.writestr("_rels/.rels", _ROOT_RELS)
+
+        sheets = "".join(
+            f'<sheet name={quoteattr(region)} sheetId="{number}" r:id="rId{number}"/>'
+            for number, region in enumerate(regions, start=1)
+        )
+        package.writestr("xl/workbook.xml", (
+            f'{_XML_DECLARATION}<workbook xmlns="{_XLSX_NS}" xmlns:r="{_XLSX_REL_NS}">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ))
+
+        sheet_rels = "".join(
+            f'<Relationship Id="rId{number}" Type="{_XLSX_REL_NS}/worksheet" Target="worksheets/sheet{number}.xml"/>'
+            for number in range(1, len(regions) + 1)
+        )
+        package.writestr("xl/_rels/workbook.xml.rels", (
+            f'{_XML_DECLARATION}<Relationships xmlns="{_XLSX_PKG_REL_NS}">{sheet_rels}'
+            f'<Relationship Id="rId{len(regions) + 1}" Type="{_XLSX_REL_NS}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ))
+        package.writestr("xl/styles.xml", _STYLES)
 
 
 # Function to upload Excel file to S3
-def upload_excel_to_s3(excel_buffer, bucket_name, file_name):
-    s3_client = boto3.client('s3')
+def upload_excel_to_s3(excel_stream, bucket_name, file_name):
     try:
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=file_name,
-            Body=excel_buffer.getvalue(),
-            ContentType='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        # upload_fileobj reads the stream in chunks, so the report bytes are never copied
+        _client('s3').upload_fileobj(
+            excel_stream,
+            bucket_name,
+            file_name,
+            ExtraArgs={'ContentType': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'},
+            Config=UPLOAD_CONFIG
         )
         print(f"✅ Report uploaded to S3: {file_name}")
     except Exception as error:
         print(f"❌ Failed to upload report: {error}")
 
 
+# Read end of the report pipe; fails the upload instead of ending it early if the producer broke
+# (raising from read() makes upload_fileobj abort the multipart upload instead of completing it)
+class _ReportPipeReader:
+    def __init__(self, pipe_reader, producer_errors):
+        self._pipe_reader = pipe_reader
+        self._producer_errors = producer_errors
+
+    def read(self, size=-1):
+        data = self._pipe_reader.read(size)
+        if not data and self._producer_errors:
+            raise self._producer_errors[0]
+        return data
+
+
+# Function to generate the Excel report and upload it to S3 at the same time
+def stream_excel_report_to_s3(region_results, bucket_name, file_name):
+    read_fd, write_fd = os.pipe()
+    producer_errors = []
+
+    def produce_report():
+        pipe_writer = os.fdopen(write_fd, 'wb')
+        try:
+            generate_excel_report(region_results, pipe_writer)
+            pipe_writer.flush()
+        except BaseException as error:
+            # Record the failure before the write end closes, so the reader never sees a clean EOF
+            producer_errors.append(error)
+        finally:
+            try:
+                pipe_writer.close()
+            except OSError:
+                pass  # the reader already gave up; its upload error is reported there
+
+    # The workbook is written on a background thread while the uploader sends finished parts
+    producer = threading.Thread(target=produce_report, daemon=True)
+    producer.start()
+    with os.fdopen(read_fd, 'rb') as pipe_reader:
+        upload_excel_to_s3(_ReportPipeReader(pipe_reader, producer_errors), bucket_name, file_name)
+    producer.join()
+
+    if producer_errors:
+        raise producer_errors[0]
+
+
 # Lambda handler
 def lambda_handler(event, context):
     try:
         print("🚀 Execution started...")
 
-        resources = fetch_resources_from_regions()
-        if not resources:
+        # Fetch, sheet generation and upload run as one pipeline; wait for the first
+        # region with results so an empty report is never uploaded
+        region_results = iter_resources_by_region()
+        first_region = next(region_results, None)
+        if first_region is None:
             print("No resources found.")
             return
 
-        categorized = categorize_by_region_with_tags(resources)
-        excel_report = generate_excel_report(categorized)
-
         current_time = datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
         file_name = f"tag-compliance-report-{current_time}.xlsx"
 
-        upload_excel_to_s3(excel_report, BUCKET_NAME, file_name)
+        stream_excel_report_to_s3(itertools.chain([first_region], region_results), BUCKET_NAME, file_name)
         print(f"✅ Excel report generated and uploaded successfully: {file_name}")
 
     except Exception as e: